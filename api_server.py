@@ -6,7 +6,7 @@ app = Flask(__name__)
 
 # Initialize the recommendation system
 recommender = UPIRecommendationSystem()
-recommender.load_data('upi_transactions_dataset.csv', 'user_behavior_profiles.csv')
+recommender.load_profiles('user_behavior_profiles.csv')
 
 @app.route('/')
 def home():
@@ -33,4 +33,5 @@ def user_insights(user_id):
     return jsonify(result)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # Development server only; use gunicorn -c gunicorn.conf.py api_server:app in production
+    app.run(port=5000)
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the UPI Recommendation API
+
+Usage: gunicorn -c gunicorn.conf.py api_server:app
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Prediction is CPU-bound, so scale with sync worker processes
+workers = int(os.environ.get('GUNICORN_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+worker_class = 'sync'
+
+# Load the app (and the recommender's data) before forking so workers
+# share those pages copy-on-write instead of each loading their own copy
+preload_app = True
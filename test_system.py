@@ -1,5 +1,26 @@
 from upi_recommendation_system import UPIRecommendationSystem
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+import numpy as np
 import pandas as pd
+import pytest
+
+BATCH_REQUESTS = [
+    {'user_id': 'USER_0001', 'category': 'Food & Dining', 'location': 'Mumbai', 'hour': 13},
+    {'user_id': 'USER_0002', 'category': 'Transportation', 'payment_method': 'Google Pay', 'hour': 20},
+    {'user_id': 'NEW_USER_123', 'category': 'Shopping', 'location': 'Bangalore'}
+]
+
+def _recommender_with_model(n_features=15):
+    """Profiles plus a small deterministic forest, so outputs are comparable"""
+    recommender = UPIRecommendationSystem()
+    recommender.load_profiles('user_behavior_profiles.csv')
+    X = np.random.default_rng(0).uniform(0, 2000, size=(200, n_features))
+    recommender.model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, X[:, 0])
+    return recommender
+
+def _without_amount(result):
+    return {key: value for key, value in result.items() if key != 'recommended_amount'}
 
 def test_system():
     print("🧪 Testing UPI Recommendation System...")
@@ -29,5 +50,105 @@ def test_system():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def test_batch_matches_scalar():
+    recommender = _recommender_with_model()
+    batch = recommender.batch_recommendations(BATCH_REQUESTS)
+    scalar = [recommender.recommend_amount(**request) for request in BATCH_REQUESTS]
+
+    # Known users: identical dicts, plain Python floats
+    assert batch[:2] == scalar[:2]
+    for result in batch[:2]:
+        assert type(result['recommended_amount']) is float
+        assert type(result['user_avg_spending']) is float
+
+    # New users: same fields; the amount carries random noise
+    assert _without_amount(batch[2]) == _without_amount(scalar[2])
+    assert 0.8 * 800 <= batch[2]['recommended_amount'] <= 1.2 * 800
+
+def test_batch_falls_back_like_scalar_on_model_error():
+    recommender = _recommender_with_model(n_features=10)
+    batch = recommender.batch_recommendations(BATCH_REQUESTS)
+    scalar = [recommender.recommend_amount(**request) for request in BATCH_REQUESTS]
+    assert [r['user_id'] for r in batch] == ['NEW_USER'] * 3
+    assert [_without_amount(r) for r in batch] == [_without_amount(r) for r in scalar]
+
+def test_batch_rejects_unknown_fields():
+    recommender = _recommender_with_model()
+    request = dict(BATCH_REQUESTS[0], amount=100)
+    with pytest.raises(TypeError):
+        recommender.recommend_amount(**request)
+    with pytest.raises(TypeError):
+        recommender.batch_recommendations([request])
+
+def test_invalid_hours_fall_back_in_batch_and_scalar():
+    recommender = _recommender_with_model()
+    requests = [
+        {'user_id': 'USER_0001', 'category': 'Food & Dining', 'hour': hour}
+        for hour in [6.5, None, 'abc']
+    ]
+    for result in recommender.batch_recommendations(requests):
+        assert result['user_id'] == 'NEW_USER'
+    for request in requests:
+        assert recommender.recommend_amount(**request)['user_id'] == 'NEW_USER'
+
+    # Whole hours given as float or string are accepted the same way
+    valid = [dict(requests[0], hour=hour) for hour in [14, 14.0, '14']]
+    batch = recommender.batch_recommendations(valid)
+    assert batch[0] == batch[1] == batch[2]
+    assert batch[0] == recommender.recommend_amount(**valid[0])
+
+def test_build_user_profiles_matches_shipped_csv():
+    recommender = UPIRecommendationSystem()
+    recommender.load_transactions('upi_transactions_dataset.csv')
+    built = recommender.build_user_profiles()
+    expected = pd.read_csv('user_behavior_profiles.csv', index_col=0).drop(columns='cluster')
+    pd.testing.assert_frame_equal(built, expected, check_dtype=False)
+
+def test_fit_encoders_matches_label_encoder():
+    transactions = pd.read_csv('upi_transactions_dataset.csv')
+    recommender = UPIRecommendationSystem()
+    recommender.fit_encoders(transactions)
+
+    for name in ['category', 'receiver_type', 'location', 'payment_method']:
+        le = LabelEncoder().fit(transactions[name])
+        assert list(recommender.encoders[name]) == list(le.classes_)
+        for value, code in zip(le.classes_, le.transform(le.classes_)):
+            assert recommender._encode_safely(name, value) == code
+        assert recommender._encode_safely(name, 'Unseen value') == 0
+
+    # Re-assigning the stored encoders keeps the lookups intact
+    codes = [recommender._encode_safely('location', value) for value in transactions['location']]
+    recommender.encoders = recommender.encoders
+    assert [recommender._encode_safely('location', value) for value in transactions['location']] == codes
+
+def test_profiles_parquet_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    original = UPIRecommendationSystem()
+    original.load_profiles('user_behavior_profiles.csv')
+    path = tmp_path / 'user_behavior_profiles.parquet'
+    original.save_profiles_parquet(path)
+
+    loaded = UPIRecommendationSystem()
+    loaded.load_profiles(path)
+    assert loaded.user_profiles['cluster'].dtype == np.int16
+    pd.testing.assert_frame_equal(loaded.user_profiles, original.user_profiles, check_dtype=False)
+    for user_id in ['USER_0001', 'USER_0002', 'USER_0531']:
+        assert loaded.get_user_insights(user_id) == original.get_user_insights(user_id)
+
+def test_compiled_model_matches_sklearn(tmp_path):
+    pytest.importorskip('skl2onnx')
+    pytest.importorskip('onnxruntime')
+    recommender = _recommender_with_model()
+    X = np.random.default_rng(1).uniform(0, 2000, size=(50, 15)).astype(np.float32)
+    expected = recommender.model.predict(X)
+
+    path = tmp_path / 'model.onnx'
+    recommender.compile_model(path)
+    np.testing.assert_allclose(recommender._predict(X), expected, rtol=1e-5)
+
+    # A precompiled model can be loaded straight from model_path
+    precompiled = UPIRecommendationSystem(model_path=str(path))
+    np.testing.assert_allclose(precompiled._predict(X), expected, rtol=1e-5)
+
 if __name__ == "__main__":
     test_system()
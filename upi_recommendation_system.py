@@ -17,31 +17,382 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.cluster import KMeans
 import pickle
 import json
+import random
+import time
+import threading
+import functools
 from datetime import datetime
+import logging
 import warnings
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the numeric helpers run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Optional request fields and their defaults (mirrors recommend_amount)
+REQUEST_DEFAULTS = {
+    'receiver_type': 'Merchant',
+    'location': 'Mumbai',
+    'payment_method': 'PhonePe',
+    'hour': 14
+}
+
+# Typical spend per category, used when a user has no profile yet
+CATEGORY_AVERAGES = {
+    'Food & Dining': 250,
+    'Transportation': 120,
+    'Shopping': 800,
+    'Bills & Utilities': 650,
+    'Entertainment': 400,
+    'Healthcare': 800,
+    'Education': 2000,
+    'Groceries': 350,
+    'Fuel': 500,
+    'Transfer to Friends': 1500
+}
+DEFAULT_CATEGORY_AVERAGE = 500
+
+# Categorical request fields encoded as model features
+ENCODED_COLUMNS = ['category', 'receiver_type', 'location', 'payment_method']
+
+# Request fields recommend_amount requires (no default)
+REQUIRED_REQUEST_FIELDS = ('user_id', 'category')
+
+# Numeric profile columns used as model features, in feature-vector order
+PROFILE_COLUMNS = ['avg_amount', 'median_amount', 'amount_std',
+                   'transaction_count', 'avg_hour', 'weekend_ratio']
+(COL_AVG_AMOUNT, COL_MEDIAN_AMOUNT, COL_AMOUNT_STD,
+ COL_TXN_COUNT, COL_AVG_HOUR, COL_WEEKEND_RATIO) = range(len(PROFILE_COLUMNS))
+
+# is_weekend proxy feature by hour of day: 1 for 18:00-06:59, else 0
+_OFFHOURS_LUT = np.array([1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0,
+                          0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1], dtype=np.uint8)
+
+# Storage dtypes for profiles saved as Parquet
+PROFILE_DTYPES = {
+    'avg_amount': 'float32',
+    'median_amount': 'float32',
+    'amount_std': 'float32',
+    'transaction_count': 'int32',
+    'avg_hour': 'float32',
+    'weekend_ratio': 'float32',
+    'cluster': 'int16'
+}
+
+CLUSTER_LABELS = {
+    0: "Conservative Spenders",
+    1: "High-Value Users",
+    2: "Frequent Small Transactions",
+    3: "Active Users",
+    4: "Balanced Spenders"
+}
+
+def _check_request_fields(request):
+    """Reject batch requests recommend_amount(**request) would reject"""
+    unexpected = set(request) - set(REQUEST_DEFAULTS) - set(REQUIRED_REQUEST_FIELDS)
+    if unexpected:
+        raise TypeError(f"Unexpected request field(s): {', '.join(sorted(unexpected))}")
+    missing = [field for field in REQUIRED_REQUEST_FIELDS if field not in request]
+    if missing:
+        raise TypeError(f"Missing required request field(s): {', '.join(missing)}")
+
+@functools.lru_cache(maxsize=1)
+def _month_day(epoch_second):
+    """(month, day) of the current date; epoch_second only keys the cache"""
+    now = datetime.now()
+    return now.month, now.day
+
+def current_month_day():
+    """Current (month, day), refreshed at most once per second"""
+    return _month_day(int(time.time()))
+
+def _coerce_hour(hour):
+    """
+    Hour as a float (accepts e.g. 14, 14.0 or "14")
+
+    Raises ValueError for anything that is not a whole number, so the
+    off-hours lookup never has to truncate a fractional hour.
+    """
+    try:
+        hour = float(hour)
+    except TypeError:
+        raise ValueError(f"Invalid hour: {hour!r}") from None
+    if not hour.is_integer():
+        raise ValueError(f"Hour must be a whole number: {hour!r}")
+    return hour
+
+def _hour_slot(hour):
+    """
+    Clamp a whole-number hour to a valid _OFFHOURS_LUT index
+
+    Out-of-range hours keep the original `hour >= 18 or hour <= 6` result:
+    anything below 0 maps to slot 0 and anything above 23 to slot 23.
+    """
+    return min(max(int(hour), 0), 23)
+
+def _hour_or_nan(hour):
+    """_coerce_hour for batch columns: NaN instead of raising"""
+    try:
+        return _coerce_hour(hour)
+    except ValueError:
+        return np.nan
+
+@njit(cache=True)
+def _assemble_features(features, profile_row, category_enc, receiver_enc, location_enc,
+                       payment_enc, hour, hour_slot, month, day):
+    """
+    Fill a (1, 15) float32 buffer with the model feature vector for one request
+
+    hour is a float and hour_slot the hour as an int clamped to 0-23 (see
+    _hour_slot), used to index the off-hours table. Callers pass these fixed
+    types so the kernel compiled at warm-up is the one used per request.
+    """
+    for i in range(6):
+        features[0, i] = profile_row[i]
+    features[0, 6] = 30  # days_since_first
+    features[0, 7] = category_enc
+    features[0, 8] = receiver_enc
+    features[0, 9] = location_enc
+    features[0, 10] = payment_enc
+    features[0, 11] = hour
+    features[0, 12] = _OFFHOURS_LUT[hour_slot]  # is_weekend proxy
+    features[0, 13] = month
+    features[0, 14] = day
+    return features
+
+@njit(cache=True)
+def _clip_amount(amount):
+    """Apply the business constraints on recommended amounts"""
+    return min(10000.0, max(10.0, amount))
+
 class UPIRecommendationSystem:
     """
     Main recommendation system class
     """
 
     def __init__(self, model_path=None):
+        self._cached_predict = functools.lru_cache(maxsize=65536)(self._predict_for_user)
+        self._ort = None
         self.model = None
         self.encoders = {}
         self.scaler = None
+        self.transactions = None
         self.user_profiles = None
         self.user_clusters = None
+        self._rng = np.random.default_rng()
+        self._local = threading.local()
+        self._category_codes = pd.Index(list(CATEGORY_AVERAGES.keys()))
+        self._category_base = np.array(list(CATEGORY_AVERAGES.values()), dtype=np.float32)
+
+        if NUMBA_AVAILABLE:
+            # Compile (or load from cache) outside of the first request
+            _assemble_features(self._scratch(), np.zeros(6), 0, 0, 0, 0, 0.0, 0, 1, 1)
+            _clip_amount(0.0)
 
         if model_path:
             self.load_model(model_path)
 
+    def load_model(self, model_path):
+        """
+        Load a trained model
+
+        A `.onnx` path is loaded as a compiled ONNX Runtime session (see
+        compile_model); anything else is unpickled. A pickled dict may carry
+        'model', 'encoders' and 'scaler' entries.
+        """
+        if str(model_path).endswith('.onnx'):
+            self._load_onnx(model_path)
+            return
+
+        with open(model_path, 'rb') as f:
+            saved = pickle.load(f)
+        if isinstance(saved, dict):
+            self.model = saved.get('model')
+            self.encoders = saved.get('encoders', {})
+            self.scaler = saved.get('scaler')
+        else:
+            self.model = saved
+
+    @property
+    def model(self):
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        """Set the sklearn model, dropping any compiled session and cached predictions"""
+        self._model = model
+        self._ort = None
+        self.clear_cache()
+
+    def compile_model(self, path):
+        """
+        Export the fitted RandomForestRegressor to ONNX and serve it from
+        ONNX Runtime, which is much faster for small prediction batches
+        """
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+
+        onnx_model = convert_sklearn(
+            self.model,
+            initial_types=[('input', FloatTensorType([None, 15]))]
+        )
+        with open(path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+        self._load_onnx(path)
+
+    def _load_onnx(self, path):
+        """Open an ONNX Runtime session for a compiled model"""
+        import onnxruntime
+
+        self._ort = onnxruntime.InferenceSession(str(path), providers=['CPUExecutionProvider'])
+        self._ort_input = self._ort.get_inputs()[0].name
+        self.clear_cache()
+
+    def _scratch(self):
+        """Reusable (1, 15) feature buffer, one per thread for threaded servers"""
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None:
+            scratch = self._local.scratch = np.empty((1, 15), dtype=np.float32)
+        return scratch
+
+    def _has_model(self):
+        return self._ort is not None or self.model is not None
+
+    def _predict(self, X):
+        """
+        Predict amounts for a float32 feature matrix, preferring the compiled
+        model (float32 matches the dtype the tree thresholds are stored in)
+        """
+        if self._scaler_mean is not None:
+            X = self._scale_inplace(X.astype(np.float32, copy=False))
+        if self._ort is not None:
+            try:
+                outputs = self._ort.run(None, {self._ort_input: X.astype(np.float32, copy=False)})
+            except Exception as e:
+                # ONNX Runtime raises its own exception types; report them the
+                # way sklearn reports bad input so callers' fallbacks apply
+                raise ValueError(f"ONNX model prediction failed: {e}") from e
+            return outputs[0].ravel()
+        return self.model.predict(X)
+
+    @property
+    def scaler(self):
+        return self._scaler
+
+    @scaler.setter
+    def scaler(self, scaler):
+        """Set a fitted StandardScaler and precompute its affine transform"""
+        self._scaler = scaler
+        self._scaler_mean = None
+        self._scaler_inv = None
+        if scaler is not None:
+            n_features = scaler.n_features_in_
+            mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+            scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+            self._scaler_mean = mean.astype(np.float32)
+            self._scaler_inv = (1.0 / scale).astype(np.float32)
+        self.clear_cache()
+
+    def _scale_inplace(self, X):
+        """Equivalent of scaler.transform(X), writing into X instead of a copy"""
+        np.subtract(X, self._scaler_mean, out=X)
+        np.multiply(X, self._scaler_inv, out=X)
+        return X
+
     def load_data(self, transactions_path, user_profiles_path):
         """Load transaction data and user profiles"""
-        self.transactions = pd.read_csv(transactions_path)
-        self.user_profiles = pd.read_csv(user_profiles_path, index_col=0)
+        self.load_transactions(transactions_path)
+        self.load_profiles(user_profiles_path)
         print(f"✅ Loaded {len(self.transactions)} transactions and {len(self.user_profiles)} user profiles")
 
+    def load_profiles(self, user_profiles_path):
+        """
+        Load user profiles only; all that serving recommendations needs
+
+        `.parquet` and `.feather` files are read directly with their stored
+        dtypes, anything else is parsed as CSV.
+        """
+        path = str(user_profiles_path)
+        if path.endswith('.parquet'):
+            self.user_profiles = pd.read_parquet(path)
+        elif path.endswith('.feather'):
+            self.user_profiles = pd.read_feather(path).set_index('user_id')
+        else:
+            self.user_profiles = pd.read_csv(path, index_col=0)
+        self._index_profiles()
+
+    def save_profiles_parquet(self, path):
+        """Write user profiles to Parquet with compact numeric dtypes"""
+        dtypes = {col: dtype for col, dtype in PROFILE_DTYPES.items() if col in self.user_profiles}
+        self.user_profiles.astype(dtypes).to_parquet(path, compression='zstd')
+
+    def load_transactions(self, transactions_path):
+        """Load the raw transaction history (training/analysis only)"""
+        self.transactions = pd.read_csv(transactions_path)
+
+    def build_user_profiles(self, transactions=None):
+        """
+        Aggregate per-user behavior profiles from transaction data
+
+        Everything is computed with grouped pandas reductions rather than
+        per-row loops. Clusters are not assigned here, so all users land in
+        cluster 0 until a `cluster` column is added. Defaults to the loaded
+        transactions.
+        """
+        if transactions is None:
+            transactions = self.transactions
+
+        profiles = transactions.groupby('user_id').agg(
+            avg_amount=('amount', 'mean'),
+            median_amount=('amount', 'median'),
+            amount_std=('amount', 'std'),
+            min_amount=('amount', 'min'),
+            max_amount=('amount', 'max'),
+            transaction_count=('amount', 'count'),
+            avg_hour=('hour', 'mean'),
+            weekend_ratio=('is_weekend', 'mean'),
+            first_transaction=('timestamp', 'min'),
+            last_transaction=('timestamp', 'max')
+        )
+        # Single-transaction users have no std; use the median across users
+        profiles['amount_std'] = profiles['amount_std'].fillna(profiles['amount_std'].median())
+
+        category_counts = transactions.groupby(['user_id', 'category']).size()
+        profiles.insert(
+            profiles.columns.get_loc('avg_hour'), 'preferred_category',
+            category_counts.groupby(level='user_id').idxmax().str[1]
+        )
+
+        self.user_profiles = profiles.round(2)
+        self._index_profiles()
+        return self.user_profiles
+
+    def _index_profiles(self):
+        """Mirror user_profiles into NumPy arrays plus a user_id -> row lookup"""
+        profiles = self.user_profiles
+        self._profile_matrix = np.ascontiguousarray(profiles[PROFILE_COLUMNS].to_numpy(dtype=np.float64))
+        self._profile_idx = {uid: i for i, uid in enumerate(profiles.index)}
+        if 'cluster' in profiles:
+            self._profile_cluster = profiles['cluster'].fillna(0).to_numpy(dtype=np.int32)
+        else:
+            self._profile_cluster = np.zeros(len(profiles), dtype=np.int32)
+        if 'preferred_category' in profiles:
+            self._preferred_category = profiles['preferred_category'].fillna('Unknown').to_numpy(dtype=object)
+        else:
+            self._preferred_category = np.full(len(profiles), 'Unknown', dtype=object)
+        self.clear_cache()
+
     def recommend_amount(self, user_id, category, receiver_type='Merchant', 
                         location='Mumbai', payment_method='PhonePe', hour=14):
         """
@@ -67,88 +418,167 @@ class UPIRecommendationSystem:
         dict : Recommendation details including amount and confidence
         """
 
-        if user_id not in self.user_profiles.index:
+        row_idx = self._profile_idx.get(user_id)
+        if row_idx is None:
             return self._recommend_for_new_user(category)
 
-        user_profile = self.user_profiles.loc[user_id]
+        month, day = current_month_day()
 
-        # Create feature vector
         try:
-            feature_vector = np.array([
-                user_profile['avg_amount'],
-                user_profile['median_amount'], 
-                user_profile['amount_std'],
-                user_profile['transaction_count'],
-                user_profile['avg_hour'],
-                user_profile['weekend_ratio'],
-                30,  # days_since_first
+            hour = _coerce_hour(hour)
+            predicted_amount, cluster, confidence, avg_amount = self._cached_predict(
+                user_id, category, receiver_type, location, payment_method, hour, month, day
+            )
+        except (ValueError, KeyError):
+            logger.exception("Error in recommendation for user %s", user_id)
+            return self._recommend_for_new_user(category)
+
+        if not self._has_model():
+            predicted_amount = avg_amount * (0.8 + 0.4 * random.random())
+
+        # Apply business constraints
+        predicted_amount = _clip_amount(predicted_amount)
+
+        return self._format_recommendation(
+            user_id, predicted_amount,
+            cluster=cluster,
+            confidence=confidence,
+            avg_amount=avg_amount,
+            category=category,
+            location=location,
+            payment_method=payment_method,
+            hour=hour
+        )
+
+    def _predict_for_user(self, user_id, category, receiver_type, location,
+                          payment_method, hour, month, day):
+        """
+        Deterministic part of a known-user recommendation
+
+        Returns (predicted_amount, cluster, confidence, avg_amount). The amount
+        is the raw model output, or the user's average when no model is set.
+        Wrapped per instance in an LRU cache as `_cached_predict`.
+        """
+        row_idx = self._profile_idx[user_id]
+        profile_row = self._profile_matrix[row_idx]
+        avg_amount = float(profile_row[COL_AVG_AMOUNT])
+        txn_count = profile_row[COL_TXN_COUNT]
+
+        if self._has_model():
+            # Create feature vector
+            feature_vector = _assemble_features(
+                self._scratch(),
+                profile_row,
                 self._encode_safely('category', category),
                 self._encode_safely('receiver_type', receiver_type),
                 self._encode_safely('location', location),
                 self._encode_safely('payment_method', payment_method),
-                hour,
-                1 if hour >= 18 or hour <= 6 else 0,  # is_weekend proxy
-                datetime.now().month,
-                datetime.now().day
-            ]).reshape(1, -1)
-
-            # Make prediction
-            if self.model:
-                predicted_amount = self.model.predict(feature_vector)[0]
-            else:
-                predicted_amount = user_profile['avg_amount'] * np.random.uniform(0.8, 1.2)
-
-            # Apply business constraints
-            predicted_amount = max(10, min(10000, predicted_amount))
-
-            return {
-                'user_id': user_id,
-                'recommended_amount': round(predicted_amount, 2),
-                'user_cluster': int(user_profile.get('cluster', 0)),
-                'confidence': min(0.95, 0.6 + (user_profile['transaction_count'] / 50)),
-                'user_avg_spending': round(user_profile['avg_amount'], 2),
-                'category': category,
-                'context': {
-                    'location': location,
-                    'time': f"{hour:02d}:00",
-                    'payment_method': payment_method
-                }
-            }
+                float(hour), _hour_slot(hour), month, day
+            )
+            predicted_amount = float(self._predict(feature_vector)[0])
+        else:
+            predicted_amount = avg_amount
 
-        except Exception as e:
-            print(f"Error in recommendation: {e}")
-            return self._recommend_for_new_user(category)
+        return (predicted_amount, int(self._profile_cluster[row_idx]),
+                float(min(0.95, 0.6 + (txn_count / 50))), avg_amount)
+
+    def clear_cache(self):
+        """Drop cached predictions; call after replacing model, encoders or profiles"""
+        self._cached_predict.cache_clear()
+
+    @property
+    def encoders(self):
+        return self._encoders
+
+    @encoders.setter
+    def encoders(self, encoders):
+        """
+        Set encoders and rebuild their value -> code lookups
+
+        Each value is either a fitted LabelEncoder or the sorted sequence of
+        its classes (what fit_encoders stores).
+        """
+        self._encoders = encoders
+        self._encoder_maps = {}
+        for name, encoder in encoders.items():
+            classes = getattr(encoder, 'classes_', encoder)
+            self._encoder_maps[name] = dict(zip(classes, range(len(classes))))
+        self.clear_cache()
+
+    def fit_encoders(self, transactions=None):
+        """
+        Build categorical lookups straight from transaction data
+
+        Uses one pd.Categorical hash pass per column instead of fitting sklearn
+        LabelEncoders. Categories come out sorted, so codes match what
+        LabelEncoder would assign. The category lists are stored through the
+        `encoders` setter, so they round-trip like fitted LabelEncoders (e.g.
+        in a pickled model bundle). Defaults to the loaded transactions.
+        """
+        if transactions is None:
+            transactions = self.transactions
+        self.encoders = {
+            name: list(pd.Categorical(transactions[name]).categories)
+            for name in ENCODED_COLUMNS
+        }
 
     def _encode_safely(self, encoder_name, value):
-        """Safely encode categorical values"""
-        if encoder_name in self.encoders:
-            try:
-                return self.encoders[encoder_name].transform([value])[0]
-            except:
-                return 0  # Default value
-        return 0
+        """
+        Safely encode categorical values
 
-    def _recommend_for_new_user(self, category):
-        """Recommend for new users based on category averages"""
-        category_averages = {
-            'Food & Dining': 250,
-            'Transportation': 120,
-            'Shopping': 800,
-            'Bills & Utilities': 650,
-            'Entertainment': 400,
-            'Healthcare': 800,
-            'Education': 2000,
-            'Groceries': 350,
-            'Fuel': 500,
-            'Transfer to Friends': 1500
+        Deliberately not memoized: this is a single dict probe, which is what
+        an lru_cache hit would cost anyway, plus the wrapper call on top.
+        """
+        encoder_map = self._encoder_maps.get(encoder_name)
+        if encoder_map is None:
+            return 0
+        return encoder_map.get(value, 0)  # Unseen values default to 0
+
+    def _encode_batch(self, encoder_name, values):
+        """Encode a column of categorical values"""
+        encoder_map = self._encoder_maps.get(encoder_name)
+        if encoder_map is None:
+            return np.zeros(len(values))
+        return pd.Series(values).map(encoder_map).fillna(0).to_numpy()
+
+    def _format_recommendation(self, user_id, amount, cluster, confidence, avg_amount,
+                               category, location, payment_method, hour):
+        """Build the response dict for a known user"""
+        return {
+            'user_id': user_id,
+            'recommended_amount': round(float(amount), 2),
+            'user_cluster': int(cluster),
+            'confidence': float(confidence),
+            'user_avg_spending': round(float(avg_amount), 2),
+            'category': category,
+            'context': {
+                'location': location,
+                'time': f"{int(hour):02d}:00",
+                'payment_method': payment_method
+            }
         }
 
-        base_amount = category_averages.get(category, 500)
-        recommended_amount = base_amount * np.random.uniform(0.8, 1.2)
+    def _recommend_for_new_user(self, category):
+        """Recommend for new users based on category averages"""
+        base_amount = CATEGORY_AVERAGES.get(category, DEFAULT_CATEGORY_AVERAGE)
+        recommended_amount = base_amount * (0.8 + 0.4 * random.random())
+        return self._format_new_user_recommendation(category, recommended_amount)
+
+    def _recommend_for_new_users(self, categories):
+        """Vectorized _recommend_for_new_user over an array of categories"""
+        codes = self._category_codes.get_indexer(categories)
+        bases = np.where(codes >= 0, self._category_base[codes.clip(min=0)], DEFAULT_CATEGORY_AVERAGE)
+        amounts = bases * self._rng.uniform(0.8, 1.2, size=len(bases))
+        return [
+            self._format_new_user_recommendation(category, float(amount))
+            for category, amount in zip(categories, amounts)
+        ]
 
+    def _format_new_user_recommendation(self, category, amount):
+        """Build the response dict for a user without a profile"""
         return {
             'user_id': 'NEW_USER',
-            'recommended_amount': round(recommended_amount, 2),
+            'recommended_amount': round(amount, 2),
             'user_cluster': 0,
             'confidence': 0.3,
             'user_avg_spending': 0,
@@ -158,43 +588,132 @@ class UPIRecommendationSystem:
 
     def get_user_insights(self, user_id):
         """Get comprehensive user insights"""
-        if user_id not in self.user_profiles.index:
+        i = self._profile_idx.get(user_id)
+        if i is None:
             return {'error': 'User not found'}
 
-        user_profile = self.user_profiles.loc[user_id]
-
-        cluster_labels = {
-            0: "Conservative Spenders",
-            1: "High-Value Users",
-            2: "Frequent Small Transactions", 
-            3: "Active Users",
-            4: "Balanced Spenders"
-        }
+        profile_row = self._profile_matrix[i]
+        cluster = int(self._profile_cluster[i])
 
         return {
             'user_id': user_id,
             'spending_profile': {
-                'avg_amount': round(user_profile['avg_amount'], 2),
-                'total_transactions': int(user_profile['transaction_count']),
-                'spending_consistency': round(user_profile['amount_std'], 2),
-                'preferred_category': user_profile.get('preferred_category', 'Unknown')
+                'avg_amount': round(float(profile_row[COL_AVG_AMOUNT]), 2),
+                'total_transactions': int(profile_row[COL_TXN_COUNT]),
+                'spending_consistency': round(float(profile_row[COL_AMOUNT_STD]), 2),
+                'preferred_category': self._preferred_category[i]
             },
             'behavior_patterns': {
-                'typical_hour': round(user_profile['avg_hour'], 1),
-                'weekend_activity': f"{user_profile['weekend_ratio']*100:.1f}%"
+                'typical_hour': round(float(profile_row[COL_AVG_HOUR]), 1),
+                'weekend_activity': f"{profile_row[COL_WEEKEND_RATIO]*100:.1f}%"
             },
             'user_segment': {
-                'cluster_id': int(user_profile.get('cluster', 0)),
-                'cluster_name': cluster_labels.get(int(user_profile.get('cluster', 0)), 'Unknown')
+                'cluster_id': cluster,
+                'cluster_name': CLUSTER_LABELS.get(cluster, 'Unknown')
             }
         }
 
-    def batch_recommendations(self, requests):
-        """Process multiple recommendation requests"""
+    def _build_feature_matrix(self, requests):
+        """
+        Build the (N, 15) float32 feature matrix for a frame of known-user requests
+
+        Returns the matrix together with the matching user profile rows.
+        """
+        profiles = self.user_profiles.reindex(requests['user_id'])
+        month, day = current_month_day()
+        n = len(requests)
+        hours = requests['hour'].to_numpy()
+
+        X = np.empty((n, 15), dtype=np.float32)
+        X[:, :6] = profiles[PROFILE_COLUMNS].to_numpy()
+        X[:, 6] = 30  # days_since_first
+        X[:, 7] = self._encode_batch('category', requests['category'])
+        X[:, 8] = self._encode_batch('receiver_type', requests['receiver_type'])
+        X[:, 9] = self._encode_batch('location', requests['location'])
+        X[:, 10] = self._encode_batch('payment_method', requests['payment_method'])
+        X[:, 11] = hours
+        X[:, 12] = _OFFHOURS_LUT[np.clip(hours, 0, 23)]  # is_weekend proxy (hours are whole)
+        X[:, 13] = month
+        X[:, 14] = day
+        return X, profiles
+
+    def _recommend_known_users(self, known_requests):
+        """Score a frame of known-user requests with a single model call"""
+        X, profiles = self._build_feature_matrix(known_requests)
+        avg_amounts = profiles['avg_amount'].to_numpy()
+        txn_counts = profiles['transaction_count'].to_numpy()
+        if 'cluster' in profiles:
+            clusters = profiles['cluster'].fillna(0).to_numpy()
+        else:
+            clusters = np.zeros(len(profiles))
+
+        if self._has_model():
+            preds = self._predict(X)
+        else:
+            preds = avg_amounts * self._rng.uniform(0.8, 1.2, size=len(profiles))
+
+        # Apply business constraints
+        preds = np.clip(preds, 10.0, 10000.0)
+        confidences = np.minimum(0.95, 0.6 + txn_counts / 50.0)
+
+        request_rows = known_requests[
+            ['user_id', 'category', 'location', 'payment_method', 'hour']
+        ].itertuples(index=False, name=None)
         results = []
+        rows = zip(request_rows, preds, clusters, confidences, avg_amounts)
+        for req, amount, cluster, confidence, avg_amount in rows:
+            user_id, category, location, payment_method, hour = req
+            results.append(self._format_recommendation(
+                user_id, amount, cluster, confidence, avg_amount,
+                category, location, payment_method, hour
+            ))
+        return results
+
+    def batch_recommendations(self, requests):
+        """
+        Process multiple recommendation requests
+
+        Known users are scored with a single model call; new users fall back
+        to category averages.
+        """
+        requests = list(requests)
+        if not requests:
+            return []
+
         for request in requests:
-            result = self.recommend_amount(**request)
-            results.append(result)
+            _check_request_fields(request)
+
+        frame = pd.DataFrame(
+            [{**REQUEST_DEFAULTS, **request} for request in requests],
+            columns=list(REQUEST_DEFAULTS) + list(REQUIRED_REQUEST_FIELDS)
+        )
+
+        # Requests with an invalid hour fall back like in recommend_amount
+        hours = np.array([_hour_or_nan(hour) for hour in frame['hour']], dtype=np.float64)
+        valid_hour = ~np.isnan(hours)
+        if not valid_hour.all():
+            logger.warning("Invalid hour in %d batch request(s)", int((~valid_hour).sum()))
+        frame['hour'] = np.where(valid_hour, hours, 0).astype(int)
+        known = frame['user_id'].isin(self.user_profiles.index).to_numpy() & valid_hour
+        results = [None] * len(frame)
+
+        if known.any():
+            try:
+                scored = self._recommend_known_users(frame[known])
+            except (ValueError, KeyError):
+                # Same fallback recommend_amount applies per request
+                logger.exception("Error in batch recommendation")
+                known = np.zeros_like(known)
+            else:
+                for pos, result in zip(np.flatnonzero(known), scored):
+                    results[pos] = result
+
+        new_positions = np.flatnonzero(~known)
+        if len(new_positions):
+            new_users = self._recommend_for_new_users(frame['category'].to_numpy()[new_positions])
+            for pos, result in zip(new_positions, new_users):
+                results[pos] = result
+
         return results
 
 def main():